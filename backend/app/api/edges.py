@@ -1,14 +1,31 @@
+import base64
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 import asyncpg
 from app.database import get_db
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 router = APIRouter()
 
 
+def _encode_cursor(created_at: datetime, row_id: str) -> str:
+    return base64.urlsafe_b64encode(
+        f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    ).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, _, row_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 class EdgeCreate(BaseModel):
     source_id: str
     target_id: str
@@ -19,6 +36,10 @@ class EdgeCreate(BaseModel):
     )
 
 
+class EdgeBulkCreate(BaseModel):
+    edges: List[EdgeCreate] = Field(min_length=1, max_length=1000)
+
+
 class EdgeResponse(BaseModel):
     id: str
     source_id: str
@@ -60,6 +81,36 @@ async def create_edge(edge: EdgeCreate, db=Depends(get_db)):
     return EdgeResponse(**dict(row))
 
 
+@router.post("/bulk", response_model=List[EdgeResponse])
+async def create_edges_bulk(payload: EdgeBulkCreate, db=Depends(get_db)):
+    """Create many edges in a single INSERT round-trip."""
+
+    edges = payload.edges
+
+    try:
+        rows = await db.fetch(
+            """
+            INSERT INTO graph_edges (source_id, target_id, edge_type, properties, created_by)
+            SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::jsonb[], $5::text[])
+            RETURNING id, source_id, target_id, edge_type, properties, created_by, created_at
+        """,
+            [e.source_id for e in edges],
+            [e.target_id for e in edges],
+            [e.edge_type for e in edges],
+            [e.properties for e in edges],
+            [e.created_by for e in edges],
+        )
+    except asyncpg.exceptions.ForeignKeyViolationError:
+        raise HTTPException(
+            status_code=400,
+            detail="source_id or target_id does not reference an existing node",
+        )
+    except asyncpg.exceptions.UniqueViolationError:
+        raise HTTPException(status_code=409, detail="Edge already exists")
+
+    return [EdgeResponse.model_construct(**dict(r)) for r in rows]
+
+
 @router.get("/{edge_id}", response_model=EdgeResponse)
 async def get_edge(edge_id: str, db=Depends(get_db)):
     """Fetch a single edge by its ULID."""
@@ -79,7 +130,7 @@ async def get_edge(edge_id: str, db=Depends(get_db)):
     return EdgeResponse(**dict(row))
 
 
-@router.get("/", response_model=List[EdgeResponse])
+@router.get("/")
 async def list_edges(
     source_id: Optional[str] = Query(None),
     target_id: Optional[str] = Query(None),
@@ -89,41 +140,96 @@ async def list_edges(
     edge_type: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, description="Keyset cursor from X-Next-Cursor; overrides offset"
+    ),
     db=Depends(get_db),
 ):
-    """List edges with common filters."""
-
-    clauses = []
-    values: List[Any] = []
-
-    def add_clause(condition: str, value: Any):
-        values.append(value)
-        clauses.append(condition.format(idx=len(values)))
-
-    if node_id:
-        add_clause("(source_id = ${idx}::text OR target_id = ${idx}::text)", node_id)
-    if source_id:
-        add_clause("source_id = ${idx}::text", source_id)
-    if target_id:
-        add_clause("target_id = ${idx}::text", target_id)
-    if edge_type:
-        add_clause("edge_type = ${idx}", edge_type)
-
-    where_clause = f"WHERE {' AND '.join(clauses)}" if clauses else ""
-    values.extend([limit, offset])
+    """List edges with common filters.
+
+    Prefer cursor (keyset) pagination for deep pages; OFFSET forces the
+    database to scan and discard all skipped rows.
+    """
+
+    cursor_ts, cursor_id = _decode_cursor(cursor) if cursor else (None, None)
+
+    if node_id is not None:
+        # `source_id = X OR target_id = X` defeats both edge indexes and
+        # degenerates into a full scan. Two index range scans merged with
+        # UNION ALL each stay on their own (source_id/target_id, created_at)
+        # index. Each arm must produce limit + offset rows — capping at just
+        # the limit would starve the outer OFFSET — so the outer sort touches
+        # at most 2 * (limit + offset) rows. The target arm excludes
+        # self-loops (already produced by the source arm), and the explicit
+        # source_id/target_id filters still AND in like the single-statement
+        # branch below.
+        rows = await db.fetch(
+            """
+            SELECT * FROM (
+                (SELECT id, source_id, target_id, edge_type, properties, created_by, created_at
+                 FROM graph_edges
+                 WHERE source_id = $1::text
+                   AND ($2::text IS NULL OR edge_type = $2)
+                   AND ($3::timestamp IS NULL OR (created_at, id) < ($3::timestamp, $4::text))
+                   AND ($7::text IS NULL OR source_id = $7)
+                   AND ($8::text IS NULL OR target_id = $8)
+                 ORDER BY created_at DESC, id DESC
+                 LIMIT $5 + $6)
+                UNION ALL
+                (SELECT id, source_id, target_id, edge_type, properties, created_by, created_at
+                 FROM graph_edges
+                 WHERE target_id = $1::text
+                   AND source_id <> $1::text
+                   AND ($2::text IS NULL OR edge_type = $2)
+                   AND ($3::timestamp IS NULL OR (created_at, id) < ($3::timestamp, $4::text))
+                   AND ($7::text IS NULL OR source_id = $7)
+                   AND ($8::text IS NULL OR target_id = $8)
+                 ORDER BY created_at DESC, id DESC
+                 LIMIT $5 + $6)
+            ) AS both_directions
+            ORDER BY created_at DESC, id DESC
+            LIMIT $5 OFFSET $6
+        """,
+            node_id,
+            edge_type,
+            cursor_ts,
+            cursor_id,
+            limit,
+            0 if cursor else offset,
+            source_id,
+            target_id,
+        )
+    else:
+        # One canonical statement regardless of which filters are set, so the
+        # SQL text is stable and Postgres parses/plans it once per connection.
+        rows = await db.fetch(
+            """
+            SELECT id, source_id, target_id, edge_type, properties, created_by, created_at
+            FROM graph_edges
+            WHERE ($1::text IS NULL OR source_id = $1)
+              AND ($2::text IS NULL OR target_id = $2)
+              AND ($3::text IS NULL OR edge_type = $3)
+              AND ($4::timestamp IS NULL OR (created_at, id) < ($4::timestamp, $5::text))
+            ORDER BY created_at DESC, id DESC
+            LIMIT $6 OFFSET $7
+        """,
+            source_id,
+            target_id,
+            edge_type,
+            cursor_ts,
+            cursor_id,
+            limit,
+            0 if cursor else offset,
+        )
 
-    rows = await db.fetch(
-        f"""
-        SELECT id, source_id, target_id, edge_type, properties, created_by, created_at
-        FROM graph_edges
-        {where_clause}
-        ORDER BY created_at DESC
-        LIMIT ${len(values)-1} OFFSET ${len(values)}
-    """,
-        *values,
-    )
+    headers = {}
+    if len(rows) == limit:
+        last = rows[-1]
+        headers["X-Next-Cursor"] = _encode_cursor(last["created_at"], last["id"])
 
-    return [EdgeResponse(**dict(r)) for r in rows]
+    # Serialize DB rows straight to JSON; re-validating them through the
+    # response model is the dominant cost for full pages.
+    return ORJSONResponse([dict(r) for r in rows], headers=headers)
 
 
 @router.delete("/{edge_id}")
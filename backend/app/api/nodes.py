@@ -1,8 +1,10 @@
+import base64
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional, Tuple
 
-from app.database import get_db
-from fastapi import APIRouter, Depends, HTTPException, Query
+from app.database import get_db, get_pool
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -56,34 +58,54 @@ class NodeResponse(BaseModel):
 async def create_node(node: NodeCreate, db=Depends(get_db)):
     """Create a new node using the ULID primary key from the database."""
 
-    columns = ["type", "title", "metadata"]
-    values = [node.type, node.title, node.metadata]
-
-    optional_fields = {
-        "text_content": node.text_content,
-        "image_url": node.image_url,
-        "audio_url": node.audio_url,
-        "video_url": node.video_url,
-        "decay_metadata": node.decay_metadata,
-        "synthesis_metadata": node.synthesis_metadata,
-    }
-
-    for col, val in optional_fields.items():
-        if val is not None:
-            columns.append(col)
-            values.append(val)
-
-    placeholders = ", ".join(f"${i+1}" for i in range(len(values)))
-    column_list = ", ".join(columns)
-
+    # Fixed column list with None for unset optionals keeps the SQL text
+    # stable, so the statement is parsed/planned once per connection. An
+    # explicit NULL would suppress the column default, so decay_metadata
+    # falls back to the same literal 004_core_tables.sql installs as the
+    # default (track_node_access needs it non-NULL).
     result = await db.fetchrow(
-        f"""
-        INSERT INTO nodes ({column_list})
-        VALUES ({placeholders})
+        """
+        INSERT INTO nodes (type, title, metadata, text_content, image_url, audio_url,
+                           video_url, decay_metadata, synthesis_metadata)
+        VALUES ($1, $2, $3, $4, $5, $6, $7,
+                COALESCE($8, '{
+                    "decay_config": {
+                        "method": "taxonomic",
+                        "half_life_days": 365,
+                        "baseline_relevance": 1.0,
+                        "min_relevance": 0.1
+                    },
+                    "usage_stats": {
+                        "access_count": 0,
+                        "last_accessed": null,
+                        "last_7_days": 0,
+                        "last_30_days": 0,
+                        "last_90_days": 0
+                    },
+                    "supersession": {
+                        "superseded_by": [],
+                        "supersedes": []
+                    },
+                    "lifecycle": {
+                        "peak_relevance_period": null,
+                        "marked_obsolete": false,
+                        "obsolete_reason": null,
+                        "archived": false
+                    }
+                }'::jsonb),
+                $9)
         RETURNING id, type::text AS type, title, text_content, image_url, audio_url, video_url,
                   metadata, decay_metadata, synthesis_metadata, created_at, updated_at
     """,
-        *values,
+        node.type,
+        node.title,
+        node.metadata,
+        node.text_content,
+        node.image_url,
+        node.audio_url,
+        node.video_url,
+        node.decay_metadata,
+        node.synthesis_metadata,
     )
 
     if not result:
@@ -92,8 +114,31 @@ async def create_node(node: NodeCreate, db=Depends(get_db)):
     return NodeResponse(**dict(result))
 
 
+def _encode_cursor(created_at: datetime, row_id: str) -> str:
+    return base64.urlsafe_b64encode(
+        f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    ).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, _, row_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _track_access_safe(node_id: str) -> None:
+    """Best-effort access tracking on its own pool connection."""
+    try:
+        await get_pool().execute("SELECT track_node_access($1)", node_id)
+    except Exception:
+        pass
+
+
 @router.get("/{node_id}", response_model=NodeResponse)
-async def get_node(node_id: str, db=Depends(get_db)):
+async def get_node(node_id: str, background_tasks: BackgroundTasks, db=Depends(get_db)):
     """Get node by ULID."""
 
     result = await db.fetchrow(
@@ -109,20 +154,29 @@ async def get_node(node_id: str, db=Depends(get_db)):
     if not result:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    # Track access for decay calculations
-    await db.execute("SELECT track_node_access($1)", node_id)
+    # Track access for decay calculations after the response is sent
+    background_tasks.add_task(_track_access_safe, node_id)
 
     return NodeResponse(**dict(result))
 
 
-@router.get("/", response_model=List[NodeResponse])
+@router.get("/")
 async def list_nodes(
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     node_type: Optional[str] = Query(None, description="Filter by node_type enum"),
+    cursor: Optional[str] = Query(
+        None, description="Keyset cursor from X-Next-Cursor; overrides offset"
+    ),
     db=Depends(get_db),
 ):
-    """List nodes with pagination and optional type filter."""
+    """List nodes with pagination and optional type filter.
+
+    Prefer cursor (keyset) pagination for deep pages; OFFSET forces the
+    database to scan and discard all skipped rows.
+    """
+
+    cursor_ts, cursor_id = _decode_cursor(cursor) if cursor else (None, None)
 
     results = await db.fetch(
         """
@@ -130,42 +184,77 @@ async def list_nodes(
                metadata, decay_metadata, synthesis_metadata, created_at, updated_at
         FROM nodes
         WHERE ($1::text IS NULL OR type::text = $1)
-        ORDER BY created_at DESC
-        LIMIT $2 OFFSET $3
+          AND ($2::timestamp IS NULL OR (created_at, id) < ($2::timestamp, $3::text))
+        ORDER BY created_at DESC, id DESC
+        LIMIT $4 OFFSET $5
     """,
         node_type,
+        cursor_ts,
+        cursor_id,
         limit,
-        offset,
+        0 if cursor else offset,
     )
 
-    return [NodeResponse(**dict(r)) for r in results]
+    headers = {}
+    if len(results) == limit:
+        last = results[-1]
+        headers["X-Next-Cursor"] = _encode_cursor(last["created_at"], last["id"])
+
+    # Serialize DB rows straight to JSON; re-validating them through the
+    # response model is the dominant cost for full pages.
+    return ORJSONResponse([dict(r) for r in results], headers=headers)
 
 
 @router.patch("/{node_id}", response_model=NodeResponse)
-async def update_node(node_id: str, payload: NodeUpdate, db=Depends(get_db)):
+async def update_node(
+    node_id: str,
+    payload: NodeUpdate,
+    background_tasks: BackgroundTasks,
+    db=Depends(get_db),
+):
     """Partial update for a node."""
 
-    updates = []
-    values = []
+    fields = payload.model_dump(exclude_unset=True)
 
-    for field, value in payload.model_dump(exclude_unset=True).items():
-        updates.append(f"{field} = ${len(values) + 1}")
-        values.append(value)
-
-    if not updates:
-        return await get_node(node_id, db)  # Nothing to update
-
-    values.append(node_id)
+    if not fields:
+        return await get_node(node_id, background_tasks, db)  # Nothing to update
 
+    # A per-field "provided" flag keeps the UPDATE statement text stable
+    # across requests (so the prepared plan is reused) without losing the
+    # ability to write an explicit null: COALESCE would silently ignore
+    # fields the payload set to null.
     result = await db.fetchrow(
-        f"""
+        """
         UPDATE nodes
-        SET {", ".join(updates)}
-        WHERE id = ${len(values)}::text
+        SET title = CASE WHEN $2 THEN $3 ELSE title END,
+            text_content = CASE WHEN $4 THEN $5 ELSE text_content END,
+            image_url = CASE WHEN $6 THEN $7 ELSE image_url END,
+            audio_url = CASE WHEN $8 THEN $9 ELSE audio_url END,
+            video_url = CASE WHEN $10 THEN $11 ELSE video_url END,
+            metadata = CASE WHEN $12 THEN $13 ELSE metadata END,
+            decay_metadata = CASE WHEN $14 THEN $15 ELSE decay_metadata END,
+            synthesis_metadata = CASE WHEN $16 THEN $17 ELSE synthesis_metadata END
+        WHERE id = $1::text
         RETURNING id, type::text AS type, title, text_content, image_url, audio_url, video_url,
                   metadata, decay_metadata, synthesis_metadata, created_at, updated_at
     """,
-        *values,
+        node_id,
+        "title" in fields,
+        fields.get("title"),
+        "text_content" in fields,
+        fields.get("text_content"),
+        "image_url" in fields,
+        fields.get("image_url"),
+        "audio_url" in fields,
+        fields.get("audio_url"),
+        "video_url" in fields,
+        fields.get("video_url"),
+        "metadata" in fields,
+        fields.get("metadata"),
+        "decay_metadata" in fields,
+        fields.get("decay_metadata"),
+        "synthesis_metadata" in fields,
+        fields.get("synthesis_metadata"),
     )
 
     if not result:
@@ -1,8 +1,15 @@
-import hashlib
-from typing import Any, Dict, List, Literal, Optional
-
-from app.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+import numpy as np
+import orjson
+
+from app.database import get_db, get_pool
+from app.services.embedding_service import deterministic_embedding
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -20,6 +27,10 @@ class SearchRequest(BaseModel):
     language: str = "en"
     include_context: bool = True
     context_size: int = Field(default=1, ge=0, le=3)
+    stream: bool = Field(
+        default=False,
+        description="Stream results as NDJSON instead of buffering a JSON array",
+    )
 
 
 class SearchResult(BaseModel):
@@ -36,65 +47,256 @@ class SearchResult(BaseModel):
     context_after: Optional[str] = None
 
 
-def _vector_literal(values: List[float]) -> str:
-    """Convert a Python list into pgvector literal."""
-    return "[" + ",".join(f"{v:.6f}" for v in values) + "]"
+# Model metadata is effectively static; cache it briefly to avoid one DB
+# round-trip per hybrid search.
+_MODEL_INFO_TTL = 300.0
+_model_info_cache: Dict[str, tuple] = {}
+_model_info_lock = asyncio.Lock()
 
 
-def _deterministic_embedding(text: str, dimension: int) -> List[float]:
-    """Fallback embedding generator based on hashing; deterministic for tests/offline use."""
-    base = hashlib.sha256(text.encode("utf-8")).digest()
-    values: List[float] = []
-    for i in range(dimension):
-        seed = hashlib.sha256(base + i.to_bytes(4, "big")).digest()
-        int_val = int.from_bytes(seed[:4], "big")
-        values.append((int_val % 2000) / 1000.0 - 1.0)  # Range roughly [-1, 1]
-    return values
+async def _get_model_info(db, model_name: str) -> Dict[str, Any]:
+    cached = _model_info_cache.get(model_name)
+    if cached and time.monotonic() - cached[0] < _MODEL_INFO_TTL:
+        return cached[1]
 
+    async with _model_info_lock:
+        # Re-check after acquiring the lock so concurrent misses dedupe
+        cached = _model_info_cache.get(model_name)
+        if cached and time.monotonic() - cached[0] < _MODEL_INFO_TTL:
+            return cached[1]
 
-async def _get_model_info(db, model_name: str) -> Dict[str, Any]:
-    row = await db.fetchrow(
-        """
-        SELECT model_name, modality, dimension
-        FROM embedding_models
-        WHERE model_name = $1 AND is_active = TRUE
-    """,
-        model_name,
+        row = await db.fetchrow(
+            """
+            SELECT model_name, modality, dimension
+            FROM embedding_models
+            WHERE model_name = $1 AND is_active = TRUE
+        """,
+            model_name,
+        )
+        if not row:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown embedding model {model_name}"
+            )
+
+        info = dict(row)
+        _model_info_cache[model_name] = (time.monotonic(), info)
+        return info
+
+
+# Popular queries repeat (autocomplete, retries); a small bounded cache
+# turns those into a dict lookup. Entries expire quickly so freshly created
+# nodes become searchable within seconds.
+_SEARCH_CACHE_TTL = 30.0
+_SEARCH_CACHE_MAX = 1024
+_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+def _search_cache_key(request: SearchRequest) -> tuple:
+    return (
+        request.query,
+        tuple(request.node_types or ()),
+        request.limit,
+        request.alpha,
+        request.use_vector,
+        request.model_name,
     )
-    if not row:
-        raise HTTPException(status_code=400, detail=f"Unknown embedding model {model_name}")
-    return dict(row)
 
 
-@router.post("/", response_model=List[SearchResult])
-async def search(request: SearchRequest, db=Depends(get_db)):
+def _search_cache_get(key: tuple) -> Optional[List[SearchResult]]:
+    entry = _search_cache.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] >= _SEARCH_CACHE_TTL:
+        _search_cache.pop(key, None)
+        return None
+    _search_cache.move_to_end(key)
+    return entry[1]
+
+
+def _search_cache_put(key: tuple, results: List[SearchResult]) -> None:
+    _search_cache[key] = (time.monotonic(), results)
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > _SEARCH_CACHE_MAX:
+        _search_cache.popitem(last=False)
+
+
+# BM25 node search statements, shared by the buffered and streaming paths.
+_PARADEDB_NODE_SQL = """
+    SELECT id AS node_id,
+           type::text AS node_type,
+           title,
+           paradedb.score(id) AS bm25_score
+    FROM nodes_search_idx.search($1)
+    WHERE ($2::text[] IS NULL OR type::text = ANY($2::text[]))
+    ORDER BY bm25_score DESC
+    LIMIT $3
+"""
+
+# search_vector is the stored generated tsvector column from migration 023;
+# matching against it runs off the GIN index instead of tokenizing per row.
+_TSVECTOR_NODE_SQL = """
+    SELECT id AS node_id,
+           type::text AS node_type,
+           title,
+           ts_rank_cd(search_vector, plainto_tsquery('english', $1)) AS bm25_score
+    FROM nodes
+    WHERE search_vector @@ plainto_tsquery('english', $1)
+      AND ($2::text[] IS NULL OR type::text = ANY($2::text[]))
+    ORDER BY bm25_score DESC
+    LIMIT $3
+"""
+
+
+async def _track_access_safe(node_ids: List[str]) -> None:
+    """Best-effort access tracking on its own pool connection."""
+    try:
+        await get_pool().execute(
+            "SELECT track_node_access(x) FROM unnest($1::text[]) AS x", node_ids
+        )
+    except Exception:
+        # Tracking is best-effort; avoid breaking search
+        pass
+
+
+async def _stream_bm25_nodes(request: SearchRequest) -> AsyncIterator[bytes]:
+    """Yield BM25 node results as NDJSON lines straight off a server cursor.
+
+    Rows are pulled in small prefetch batches and written out as they
+    arrive, so time-to-first-result and peak memory stay flat regardless
+    of the requested limit.
+    """
+    node_ids: List[str] = []
+    async with get_pool().acquire() as conn:
+        try:
+            async with conn.transaction():
+                async for row in conn.cursor(
+                    _PARADEDB_NODE_SQL,
+                    request.query,
+                    request.node_types,
+                    request.limit,
+                    prefetch=64,
+                ):
+                    node_ids.append(row["node_id"])
+                    yield orjson.dumps(dict(row)) + b"\n"
+        except Exception:
+            # ParadeDB fails at statement prepare time (before any row is
+            # yielded); retry with the tsvector fallback in a fresh txn.
+            async with conn.transaction():
+                async for row in conn.cursor(
+                    _TSVECTOR_NODE_SQL,
+                    request.query,
+                    request.node_types,
+                    request.limit,
+                    prefetch=64,
+                ):
+                    node_ids.append(row["node_id"])
+                    yield orjson.dumps(dict(row)) + b"\n"
+
+    if node_ids:
+        await _track_access_safe(node_ids)
+
+
+def _ndjson(results: List[SearchResult]):
+    for r in results:
+        yield orjson.dumps(r.__dict__) + b"\n"
+
+
+@router.post("/")
+async def search(
+    request: SearchRequest, background_tasks: BackgroundTasks, db=Depends(get_db)
+):
     """Hybrid/BM25 search for nodes or chunks."""
 
+    if request.stream:
+        if request.mode == "node" and not (
+            request.use_vector or request.query_embedding
+        ):
+            # Pure BM25 can stream directly from a database cursor
+            return StreamingResponse(
+                _stream_bm25_nodes(request), media_type="application/x-ndjson"
+            )
+        # Vector/chunk searches rank server-side and arrive materialized;
+        # stream the serialization so large payloads still go out in chunks.
+        results = (
+            await _search_chunks(request, db)
+            if request.mode == "chunk"
+            else await _search_nodes(request, db)
+        )
+        if results:
+            background_tasks.add_task(
+                _track_access_safe, [r.node_id for r in results]
+            )
+        return StreamingResponse(_ndjson(results), media_type="application/x-ndjson")
+
     if request.mode == "chunk":
+        # Chunk results carry large content/context payloads; don't cache
         results = await _search_chunks(request, db)
     else:
-        results = await _search_nodes(request, db)
-
-    # Track access for found nodes
-    for result in results:
-        try:
-            await db.execute("SELECT track_node_access($1)", result.node_id)
-        except Exception:
-            # Tracking is best-effort; avoid breaking search
-            pass
+        # Client-supplied embeddings are an unbounded key space; skip those
+        cache_key = None if request.query_embedding else _search_cache_key(request)
+        results = _search_cache_get(cache_key) if cache_key else None
+        if results is None:
+            results = await _search_nodes(request, db)
+            if cache_key:
+                _search_cache_put(cache_key, results)
+
+    # Track access for found nodes after the response is sent
+    if results:
+        background_tasks.add_task(
+            _track_access_safe, [r.node_id for r in results]
+        )
 
-    return results
+    # model_construct leaves plain field values in __dict__; encode those
+    # directly instead of re-validating through the response model.
+    return ORJSONResponse([r.__dict__ for r in results])
 
 
 async def _search_nodes(request: SearchRequest, db) -> List[SearchResult]:
+    query_embedding = None
     if request.use_vector or request.query_embedding:
-        try:
-            return await _hybrid_node_search(request, db)
-        except Exception:
-            # Fallback to BM25 if vector search fails (e.g., pgvector missing)
-            pass
+        model = await _get_model_info(db, request.model_name)
+        query_embedding = np.asarray(
+            request.query_embedding
+            or deterministic_embedding(request.query, model["dimension"]),
+            dtype=np.float32,
+        )
 
-    return await _bm25_node_search(request, db)
+    try:
+        # search_nodes_v2 dispatches hybrid vs BM25 server-side, so both
+        # variants cost exactly one round-trip.
+        rows = await db.fetch(
+            "SELECT * FROM search_nodes_v2($1, $2, $3, $4, $5, $6::node_type[])",
+            request.query,
+            query_embedding,
+            request.model_name,
+            request.alpha,
+            request.limit,
+            request.node_types,
+        )
+    except Exception:
+        # Pre-migration-019 databases: keep the old two-step fallback
+        if query_embedding is not None:
+            try:
+                return await _hybrid_node_search(request, db)
+            except Exception:
+                pass
+        return await _bm25_node_search(request, db)
+
+    results: List[SearchResult] = []
+    for row in rows:
+        data = dict(row)
+        results.append(
+            SearchResult.model_construct(
+                node_id=data["node_id"],
+                node_type=data.get("node_type"),
+                title=data.get("title"),
+                bm25_score=data.get("bm25_score"),
+                vector_score=data.get("vector_score"),
+                hybrid_score=data.get("hybrid_score"),
+            )
+        )
+
+    return results
 
 
 async def _bm25_node_search(request: SearchRequest, db) -> List[SearchResult]:
@@ -102,37 +304,14 @@ async def _bm25_node_search(request: SearchRequest, db) -> List[SearchResult]:
     # Attempt ParadeDB/pg_search index
     try:
         rows = await db.fetch(
-            """
-            SELECT id AS node_id,
-                   type::text AS node_type,
-                   title,
-                   paradedb.score(id) AS bm25_score
-            FROM nodes_search_idx.search($1)
-            WHERE ($2::text[] IS NULL OR type::text = ANY($2::text[]))
-            ORDER BY bm25_score DESC
-            LIMIT $3
-        """,
+            _PARADEDB_NODE_SQL,
             request.query,
             request.node_types,
             request.limit,
         )
     except Exception:
         rows = await db.fetch(
-            """
-            SELECT id AS node_id,
-                   type::text AS node_type,
-                   title,
-                   ts_rank_cd(
-                       to_tsvector('english', COALESCE(title, '') || ' ' || COALESCE(text_content, '')),
-                       plainto_tsquery('english', $1)
-                   ) AS bm25_score
-            FROM nodes
-            WHERE to_tsvector('english', COALESCE(title, '') || ' ' || COALESCE(text_content, ''))
-                  @@ plainto_tsquery('english', $1)
-              AND ($2::text[] IS NULL OR type::text = ANY($2::text[]))
-            ORDER BY bm25_score DESC
-            LIMIT $3
-        """,
+            _TSVECTOR_NODE_SQL,
             request.query,
             request.node_types,
             request.limit,
@@ -142,7 +321,7 @@ async def _bm25_node_search(request: SearchRequest, db) -> List[SearchResult]:
     for row in rows:
         data = dict(row)
         results.append(
-            SearchResult(
+            SearchResult.model_construct(
                 node_id=data["node_id"],
                 node_type=data.get("node_type"),
                 title=data.get("title"),
@@ -155,16 +334,15 @@ async def _bm25_node_search(request: SearchRequest, db) -> List[SearchResult]:
 
 async def _hybrid_node_search(request: SearchRequest, db) -> List[SearchResult]:
     model = await _get_model_info(db, request.model_name)
-    query_embedding = request.query_embedding or _deterministic_embedding(
+    query_embedding = request.query_embedding or deterministic_embedding(
         request.query, model["dimension"]
     )
-    vector_literal = _vector_literal(query_embedding)
 
     rows = await db.fetch(
         """
         SELECT * FROM hybrid_search(
             $1,
-            $2::vector,
+            $2,
             $3,
             $4,
             $5,
@@ -172,7 +350,7 @@ async def _hybrid_node_search(request: SearchRequest, db) -> List[SearchResult]:
         )
     """,
         request.query,
-        vector_literal,
+        np.asarray(query_embedding, dtype=np.float32),
         request.model_name,
         request.alpha,
         request.limit,
@@ -183,7 +361,7 @@ async def _hybrid_node_search(request: SearchRequest, db) -> List[SearchResult]:
     for row in rows:
         data = dict(row)
         results.append(
-            SearchResult(
+            SearchResult.model_construct(
                 node_id=data["node_id"],
                 node_type=data.get("node_type"),
                 title=data.get("title"),
@@ -219,7 +397,7 @@ async def _search_chunks(request: SearchRequest, db) -> List[SearchResult]:
     for row in rows:
         data = dict(row)
         results.append(
-            SearchResult(
+            SearchResult.model_construct(
                 node_id=data["node_id"],
                 title=data.get("node_title"),
                 chunk_id=data.get("chunk_id"),
@@ -236,16 +414,15 @@ async def _search_chunks(request: SearchRequest, db) -> List[SearchResult]:
 
 async def _hybrid_chunk_search(request: SearchRequest, db) -> List[SearchResult]:
     model = await _get_model_info(db, request.model_name)
-    query_embedding = request.query_embedding or _deterministic_embedding(
+    query_embedding = request.query_embedding or deterministic_embedding(
         request.query, model["dimension"]
     )
-    vector_literal = _vector_literal(query_embedding)
 
     rows = await db.fetch(
         """
         SELECT * FROM hybrid_search_chunks(
             $1,
-            $2::vector,
+            $2,
             $3,
             $4,
             $5,
@@ -253,7 +430,7 @@ async def _hybrid_chunk_search(request: SearchRequest, db) -> List[SearchResult]
         )
     """,
         request.query,
-        vector_literal,
+        np.asarray(query_embedding, dtype=np.float32),
         request.model_name,
         request.alpha,
         request.limit,
@@ -264,7 +441,7 @@ async def _hybrid_chunk_search(request: SearchRequest, db) -> List[SearchResult]
     for row in rows:
         data = dict(row)
         results.append(
-            SearchResult(
+            SearchResult.model_construct(
                 node_id=data["node_id"],
                 title=data.get("node_title"),
                 chunk_id=data.get("chunk_id"),
@@ -1,9 +1,10 @@
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, Final, List, Literal, Optional
 
 from app.database import get_db
 from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel, Field
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field
 
 router = APIRouter()
 
@@ -22,6 +23,10 @@ class CategoryCreate(BaseModel):
 
 
 class CategoryResponse(BaseModel):
+    # Outbound-only snapshot of a DB row: immutable, and unknown columns
+    # from widened SELECTs are dropped rather than validated.
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     id: int
     name: str
     path: str
@@ -43,6 +48,8 @@ class NodeCategoryAssignment(BaseModel):
 
 
 class NodeCategoryResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     node_id: str
     category: CategoryResponse
     confidence: float
@@ -50,48 +57,128 @@ class NodeCategoryResponse(BaseModel):
     assigned_at: datetime
 
 
+# Hot statements as module constants: a single SQL text per query means
+# asyncpg's per-connection statement cache always hits, so after the first
+# call each query is a pure Bind/Execute of an already-prepared plan.
+# The list endpoints let Postgres build the JSON document: json_agg over
+# row_to_json produces the final response body in one pass, so Python never
+# materializes rows or serializes anything.
+_SQL_LIST_CATEGORIES: Final = """
+    SELECT COALESCE(json_agg(row_to_json(t) ORDER BY t.path), '[]'::json)::text
+    FROM (
+        SELECT id, name, path, level, parent_id, topic_importance,
+               change_velocity, usage_focus, keywords, related_categories, created_at
+        FROM taxonomy
+    ) t
+"""
+
+_SQL_GET_CATEGORY: Final = """
+    SELECT id, name, path, level, parent_id, topic_importance,
+           change_velocity, usage_focus, keywords, related_categories, created_at
+    FROM taxonomy
+    WHERE id = $1
+"""
+
+_SQL_CREATE_CATEGORY: Final = """
+    INSERT INTO taxonomy (
+        name, parent_id, level, path, topic_importance,
+        change_velocity, usage_focus, keywords, related_categories
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    RETURNING id, name, path, level, parent_id, topic_importance,
+              change_velocity, usage_focus, keywords, related_categories, created_at
+"""
+
+_SQL_ASSIGN_CATEGORY: Final = """
+    WITH ins AS (
+        INSERT INTO node_categories (node_id, category_id, confidence, assigned_by)
+        VALUES ($1::text, $2, $3, $4)
+        ON CONFLICT (node_id, category_id) DO UPDATE
+        SET confidence = EXCLUDED.confidence,
+            assigned_by = EXCLUDED.assigned_by,
+            assigned_at = NOW()
+        RETURNING node_id, category_id, confidence, assigned_by, assigned_at
+    )
+    SELECT ins.node_id,
+           ins.confidence,
+           ins.assigned_by,
+           ins.assigned_at,
+           t.id,
+           t.name,
+           t.path,
+           t.level,
+           t.parent_id,
+           t.topic_importance,
+           t.change_velocity,
+           t.usage_focus,
+           t.keywords,
+           t.related_categories,
+           t.created_at
+    FROM ins
+    JOIN taxonomy t ON t.id = ins.category_id
+"""
+
+_SQL_LIST_NODE_CATEGORIES: Final = """
+    SELECT COALESCE(json_agg(
+        json_build_object(
+            'node_id', nc.node_id,
+            'category', json_build_object(
+                'id', t.id,
+                'name', t.name,
+                'path', t.path,
+                'level', t.level,
+                'parent_id', t.parent_id,
+                'topic_importance', t.topic_importance,
+                'change_velocity', t.change_velocity,
+                'usage_focus', t.usage_focus,
+                'keywords', t.keywords,
+                'related_categories', t.related_categories,
+                'created_at', t.created_at
+            ),
+            'confidence', nc.confidence,
+            'assigned_by', nc.assigned_by,
+            'assigned_at', nc.assigned_at
+        ) ORDER BY t.path
+    ), '[]'::json)::text
+    FROM node_categories nc
+    JOIN taxonomy t ON t.id = nc.category_id
+    WHERE nc.node_id = $1::text
+"""
+
+_SQL_REMOVE_ASSIGNMENT: Final = """
+    DELETE FROM node_categories
+    WHERE node_id = $1::text AND category_id = $2
+"""
+
+
 def _level_from_path(path: str) -> int:
     """Translate a path like 'a/b/c' into a hierarchy level (0-indexed)."""
     segments = [p for p in path.split("/") if p]
     return max(len(segments) - 1, 0)
 
 
-@router.get("/", response_model=List[CategoryResponse])
+@router.get("/")
 async def list_categories(db=Depends(get_db)):
     """List all taxonomy categories ordered by path."""
 
-    rows = await db.fetch(
-        """
-        SELECT id, name, path, level, parent_id, topic_importance,
-               change_velocity, usage_focus, keywords, related_categories, created_at
-        FROM taxonomy
-        ORDER BY path
-    """
-    )
-    return [CategoryResponse(**dict(r)) for r in rows]
+    body = await db.fetchval(_SQL_LIST_CATEGORIES)
+    return Response(content=body, media_type="application/json")
 
 
-@router.get("/{category_id}", response_model=CategoryResponse)
+@router.get("/{category_id}")
 async def get_category(category_id: int, db=Depends(get_db)):
     """Get a single taxonomy category."""
 
-    row = await db.fetchrow(
-        """
-        SELECT id, name, path, level, parent_id, topic_importance,
-               change_velocity, usage_focus, keywords, related_categories, created_at
-        FROM taxonomy
-        WHERE id = $1
-    """,
-        category_id,
-    )
+    row = await db.fetchrow(_SQL_GET_CATEGORY, category_id)
 
     if not row:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    return CategoryResponse(**dict(row))
+    # DB rows are already trusted; model_construct skips re-validation
+    return CategoryResponse.model_construct(**dict(row))
 
 
-@router.post("/", response_model=CategoryResponse)
+@router.post("/")
 async def create_category(payload: CategoryCreate, db=Depends(get_db)):
     """Create a taxonomy category. Level is derived from the provided path."""
 
@@ -102,15 +189,7 @@ async def create_category(payload: CategoryCreate, db=Depends(get_db)):
         )
 
     row = await db.fetchrow(
-        """
-        INSERT INTO taxonomy (
-            name, parent_id, level, path, topic_importance,
-            change_velocity, usage_focus, keywords, related_categories
-        )
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        RETURNING id, name, path, level, parent_id, topic_importance,
-                  change_velocity, usage_focus, keywords, related_categories, created_at
-    """,
+        _SQL_CREATE_CATEGORY,
         payload.name,
         payload.parent_id,
         level,
@@ -125,23 +204,15 @@ async def create_category(payload: CategoryCreate, db=Depends(get_db)):
     if not row:
         raise HTTPException(status_code=500, detail="Category could not be created")
 
-    return CategoryResponse(**dict(row))
+    return CategoryResponse.model_construct(**dict(row))
 
 
-@router.post("/assign", response_model=NodeCategoryResponse)
+@router.post("/assign")
 async def assign_category(assignment: NodeCategoryAssignment, db=Depends(get_db)):
     """Assign a taxonomy category to a node with confidence."""
 
     row = await db.fetchrow(
-        """
-        INSERT INTO node_categories (node_id, category_id, confidence, assigned_by)
-        VALUES ($1::text, $2, $3, $4)
-        ON CONFLICT (node_id, category_id) DO UPDATE
-        SET confidence = EXCLUDED.confidence,
-            assigned_by = EXCLUDED.assigned_by,
-            assigned_at = NOW()
-        RETURNING node_id, category_id, confidence, assigned_by, assigned_at
-    """,
+        _SQL_ASSIGN_CATEGORY,
         assignment.node_id,
         assignment.category_id,
         assignment.confidence,
@@ -151,72 +222,38 @@ async def assign_category(assignment: NodeCategoryAssignment, db=Depends(get_db)
     if not row:
         raise HTTPException(status_code=500, detail="Could not assign category")
 
-    category = await get_category(row["category_id"], db)
-
-    return NodeCategoryResponse(
+    # The CTE joins the upserted assignment back to its category, so the
+    # response needs no second round-trip through get_category.
+    return NodeCategoryResponse.model_construct(
         node_id=row["node_id"],
-        category=category,
+        category=CategoryResponse.model_construct(
+            id=row["id"],
+            name=row["name"],
+            path=row["path"],
+            level=row["level"],
+            parent_id=row["parent_id"],
+            topic_importance=row["topic_importance"],
+            change_velocity=row["change_velocity"],
+            usage_focus=row["usage_focus"],
+            keywords=row["keywords"],
+            related_categories=row["related_categories"],
+            created_at=row["created_at"],
+        ),
         confidence=row["confidence"],
         assigned_by=row["assigned_by"],
         assigned_at=row["assigned_at"],
     )
 
 
-@router.get("/node/{node_id}", response_model=List[NodeCategoryResponse])
+@router.get("/node/{node_id}")
 async def list_node_categories(
     node_id: str,
     db=Depends(get_db),
 ):
     """List categories linked to a node."""
 
-    rows = await db.fetch(
-        """
-        SELECT nc.node_id,
-               nc.category_id,
-               nc.confidence,
-               nc.assigned_by,
-               nc.assigned_at,
-               t.id,
-               t.name,
-               t.path,
-               t.level,
-               t.parent_id,
-               t.topic_importance,
-               t.change_velocity,
-               t.usage_focus,
-               t.keywords,
-               t.related_categories,
-               t.created_at
-        FROM node_categories nc
-        JOIN taxonomy t ON t.id = nc.category_id
-        WHERE nc.node_id = $1::text
-        ORDER BY t.path
-    """,
-        node_id,
-    )
-
-    return [
-        NodeCategoryResponse(
-            node_id=row["node_id"],
-            category=CategoryResponse(
-                id=row["id"],
-                name=row["name"],
-                path=row["path"],
-                level=row["level"],
-                parent_id=row["parent_id"],
-                topic_importance=row["topic_importance"],
-                change_velocity=row["change_velocity"],
-                usage_focus=row["usage_focus"],
-                keywords=row["keywords"],
-                related_categories=row["related_categories"],
-                created_at=row["created_at"],
-            ),
-            confidence=row["confidence"],
-            assigned_by=row["assigned_by"],
-            assigned_at=row["assigned_at"],
-        )
-        for row in rows
-    ]
+    body = await db.fetchval(_SQL_LIST_NODE_CATEGORIES, node_id)
+    return Response(content=body, media_type="application/json")
 
 
 @router.delete("/assign")
@@ -227,14 +264,7 @@ async def remove_assignment(
 ):
     """Remove a node/category assignment."""
 
-    result = await db.execute(
-        """
-        DELETE FROM node_categories
-        WHERE node_id = $1::text AND category_id = $2
-    """,
-        node_id,
-        category_id,
-    )
+    result = await db.execute(_SQL_REMOVE_ASSIGNMENT, node_id, category_id)
 
     if result == "DELETE 0":
         raise HTTPException(status_code=404, detail="Assignment not found")
@@ -4,6 +4,8 @@ from app.api import edges, embeddings, nodes, search, taxonomy
 from app.database import close_db_pool, init_db_pool
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 
 @asynccontextmanager
@@ -12,6 +14,7 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting Brain Graph API...")
     await init_db_pool()
     print("✅ Database pool initialized")
+    embeddings.init_service()
 
     yield
 
@@ -26,8 +29,13 @@ app = FastAPI(
     description="Personal Knowledge Management System",
     version="3.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Compress sizeable JSON responses (search results, node/taxonomy lists);
+# small bodies are passed through untouched.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
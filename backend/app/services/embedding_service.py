@@ -1,97 +1,186 @@
+import asyncio
 import hashlib
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, Final, List, Optional, Tuple
 
-
-def _vector_literal(values: List[float]) -> str:
-    return "[" + ",".join(f"{v:.6f}" for v in values) + "]"
+import blake3
+import numpy as np
 
 
 def _hash_content(content: str, model_name: str, source_part: str) -> str:
-    return hashlib.sha256(f"{content}|{model_name}|{source_part}".encode("utf-8")).hexdigest()
+    # Only equality matters for change detection, so use BLAKE3 (same as the
+    # embeddings API) rather than the slower SHA-256.
+    return blake3.blake3(
+        f"{content}|{model_name}|{source_part}".encode("utf-8")
+    ).hexdigest()
+
+
+try:
+    from numba import njit
+
+    @njit(cache=True)
+    def _ints_to_unit_floats(ints: np.ndarray) -> np.ndarray:
+        out = np.empty(ints.shape[0], dtype=np.float32)
+        for i in range(ints.shape[0]):
+            out[i] = (ints[i] % 2000) / 1000.0 - 1.0
+        return out
+
+except ImportError:
+    # numba is an optional accelerator; the vectorized NumPy pass is the
+    # portable default and produces identical values.
+    def _ints_to_unit_floats(ints: np.ndarray) -> np.ndarray:
+        return (ints % 2000).astype(np.float32) / 1000.0 - 1.0
+
+
+def deterministic_embedding(content: str, dimension: int) -> List[float]:
+    """Deterministic vector for offline/testing use.
+
+    This is the single generator for both stored embeddings and the search
+    fallback (app.api.search imports it), so a text's query-side vector
+    always matches its stored one. One SHAKE-128 call yields all the
+    pseudo-random bytes at once; the modular arithmetic then runs as a
+    single fused pass instead of a per-dimension Python hash loop.
+    """
+    raw = hashlib.shake_128(content.encode("utf-8")).digest(dimension * 4)
+    ints = np.frombuffer(raw, dtype=">u4").astype(np.uint32)
+    values = _ints_to_unit_floats(ints)  # Range roughly [-1, 1]
+    return values.tolist()
+
+
+# Hot statements as module constants: a single SQL text per query means
+# asyncpg's per-connection statement cache always hits, so after the first
+# call each query is a pure Bind/Execute of an already-prepared plan.
+_SQL_LIST_MODELS: Final = """
+    SELECT model_name, model_version, modality, dimension, is_active, is_default
+    FROM embedding_models
+    ORDER BY is_default DESC, model_name
+"""
+
+_SQL_MODEL_BY_NAME: Final = """
+    SELECT model_name, modality, dimension, 'full' AS source_part, 1 AS priority
+    FROM embedding_models
+    WHERE model_name = $1 AND is_active = TRUE
+"""
+
+_SQL_MODELS_FOR_NODE_TYPE: Final = """
+    SELECT gm.model_name,
+           gm.source_part,
+           em.modality,
+           em.dimension,
+           gm.priority
+    FROM get_models_for_node($1::node_type) gm
+    JOIN embedding_models em ON em.model_name = gm.model_name
+    WHERE em.is_active = TRUE
+    ORDER BY gm.priority
+"""
+
+_SQL_DEFAULT_MODEL: Final = """
+    SELECT model_name, modality, dimension, 'full' AS source_part, 1 AS priority
+    FROM embedding_models
+    WHERE is_default = TRUE
+    ORDER BY added_at DESC NULLS LAST
+    LIMIT 1
+"""
+
+_SQL_FETCH_NODE: Final = """
+    SELECT id, type::text AS type, title, text_content
+    FROM nodes
+    WHERE id = $1::text
+"""
 
+_SQL_UPSERT_EMBEDDING: Final = """
+    INSERT INTO node_embeddings (
+        node_id, chunk_id, modality, model_name, source_part,
+        dimension, embedding, content_hash, generation_time_ms, token_count
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+    ON CONFLICT (node_id, chunk_id, modality, model_name, source_part)
+    DO UPDATE SET
+        embedding = EXCLUDED.embedding,
+        content_hash = EXCLUDED.content_hash,
+        generated_at = NOW(),
+        last_accessed = NOW(),
+        dimension = EXCLUDED.dimension,
+        generation_time_ms = COALESCE(EXCLUDED.generation_time_ms, node_embeddings.generation_time_ms),
+        token_count = COALESCE(EXCLUDED.token_count, node_embeddings.token_count)
+"""
 
-def _deterministic_embedding(content: str, dimension: int) -> List[float]:
-    """Deterministic vector for offline/testing use."""
-    base = hashlib.sha256(content.encode("utf-8")).digest()
-    values: List[float] = []
-    for i in range(dimension):
-        seed = hashlib.sha256(base + i.to_bytes(4, "big")).digest()
-        int_val = int.from_bytes(seed[:4], "big")
-        values.append((int_val % 2000) / 1000.0 - 1.0)
-    return values
+_SQL_UPSERT_EMBEDDING_RETURNING: Final = (
+    _SQL_UPSERT_EMBEDDING
+    + "    RETURNING id, node_id, chunk_id, modality, model_name, source_part, dimension, generated_at\n"
+)
+
+_SQL_FETCH_STORED: Final = """
+    SELECT e.id, e.node_id, e.chunk_id, e.modality, e.model_name,
+           e.source_part, e.dimension, e.generated_at
+    FROM node_embeddings e
+    JOIN unnest($2::text[], $3::text[]) AS m(model_name, source_part)
+      ON e.model_name = m.model_name AND e.source_part = m.source_part
+    WHERE e.node_id = $1::text AND e.chunk_id IS NULL
+"""
+
+
+# Process-wide latch: create_hnsw_indexes() is idempotent DDL, so one
+# successful call per process is enough. The lock collapses a burst of
+# first writes into a single DDL round-trip instead of N concurrent ones.
+_hnsw_indexes_ready = asyncio.Event()
+_hnsw_indexes_lock = asyncio.Lock()
+
+# Model routing changes rarely (migrations/admin actions), so cache the
+# resolved model list per (node_type, model_name) briefly.
+_MODEL_SELECT_TTL = 60.0
+_model_select_cache: Dict[Tuple[Optional[str], Optional[str]], tuple] = {}
+_model_select_lock = asyncio.Lock()
 
 
 class EmbeddingService:
     """Handles embedding selection, generation and persistence."""
 
     def __init__(self, db):
+        # ``db`` may be an asyncpg pool or a single connection; both expose
+        # fetch/fetchrow/execute, so the service works per-request or app-wide.
         self.db = db
 
     async def list_models(self) -> List[Dict[str, Any]]:
-        rows = await self.db.fetch(
-            """
-            SELECT model_name, model_version, modality, dimension, is_active, is_default
-            FROM embedding_models
-            ORDER BY is_default DESC, model_name
-        """
-        )
+        rows = await self.db.fetch(_SQL_LIST_MODELS)
         return [dict(r) for r in rows]
 
     async def _select_models(self, node_type: str, model_name: Optional[str]):
+        key = (node_type, model_name)
+        cached = _model_select_cache.get(key)
+        if cached and time.monotonic() - cached[0] < _MODEL_SELECT_TTL:
+            return cached[1]
+
+        async with _model_select_lock:
+            # Re-check after acquiring the lock so concurrent misses dedupe
+            cached = _model_select_cache.get(key)
+            if cached and time.monotonic() - cached[0] < _MODEL_SELECT_TTL:
+                return cached[1]
+
+            models = await self._select_models_uncached(node_type, model_name)
+            _model_select_cache[key] = (time.monotonic(), models)
+            return models
+
+    async def _select_models_uncached(self, node_type: str, model_name: Optional[str]):
         if model_name:
-            row = await self.db.fetchrow(
-                """
-                SELECT model_name, modality, dimension, 'full' AS source_part, 1 AS priority
-                FROM embedding_models
-                WHERE model_name = $1 AND is_active = TRUE
-            """,
-                model_name,
-            )
+            row = await self.db.fetchrow(_SQL_MODEL_BY_NAME, model_name)
             if not row:
                 raise ValueError(f"Model {model_name} is not available")
             return [dict(row)]
 
-        rows = await self.db.fetch(
-            """
-            SELECT gm.model_name,
-                   gm.source_part,
-                   em.modality,
-                   em.dimension,
-                   gm.priority
-            FROM get_models_for_node($1::node_type) gm
-            JOIN embedding_models em ON em.model_name = gm.model_name
-            WHERE em.is_active = TRUE
-            ORDER BY gm.priority
-        """,
-            node_type,
-        )
+        rows = await self.db.fetch(_SQL_MODELS_FOR_NODE_TYPE, node_type)
 
         if rows:
             return [dict(r) for r in rows]
 
         # Fallback: single default model
-        fallback = await self.db.fetchrow(
-            """
-            SELECT model_name, modality, dimension, 'full' AS source_part, 1 AS priority
-            FROM embedding_models
-            WHERE is_default = TRUE
-            ORDER BY added_at DESC NULLS LAST
-            LIMIT 1
-        """
-        )
+        fallback = await self.db.fetchrow(_SQL_DEFAULT_MODEL)
         return [dict(fallback)] if fallback else []
 
     async def generate_for_node(
         self, node_id: str, model_name: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        node = await self.db.fetchrow(
-            """
-            SELECT id, type::text AS type, title, text_content
-            FROM nodes
-            WHERE id = $1::text
-        """,
-            node_id,
-        )
+        node = await self.db.fetchrow(_SQL_FETCH_NODE, node_id)
 
         if not node:
             raise ValueError("Node not found")
@@ -106,29 +195,50 @@ class EmbeddingService:
         if not models:
             raise ValueError("No embedding models available")
 
-        stored: List[Dict[str, Any]] = []
-
-        for model in models:
-            content = (
-                node["title"]
-                if model["source_part"] == "title"
-                else text_full
-            )
-            embedding = _deterministic_embedding(content, model["dimension"])
-            content_hash = _hash_content(content, model["model_name"], model["source_part"])
-
-            stored_row = await self.store_embedding(
-                node_id=node["id"],
-                modality=model["modality"],
-                model_name=model["model_name"],
-                source_part=model["source_part"],
-                embedding=embedding,
-                content_hash=content_hash,
-                dimension=model["dimension"],
+        # Per-model vectors are independent, so generate them concurrently;
+        # the writes below stay in one batch either way.
+        items = list(
+            await asyncio.gather(
+                *(self._build_item(node, text_full, model) for model in models)
             )
-            stored.append(stored_row)
+        )
 
-        return stored
+        # One batched upsert plus one SELECT for the stored metadata keeps
+        # this at two round-trips regardless of how many models apply.
+        await self.store_embeddings_batch(items)
+
+        rows = await self.db.fetch(
+            _SQL_FETCH_STORED,
+            node["id"],
+            [item["model_name"] for item in items],
+            [item["source_part"] for item in items],
+        )
+
+        return [dict(r) for r in rows]
+
+    async def _build_item(
+        self, node, text_full: str, model: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Produce one ``store_embeddings_batch`` item for a node/model pair."""
+        content = node["title"] if model["source_part"] == "title" else text_full
+        # Vector generation is pure CPU; running it in a worker thread keeps
+        # the event loop serving other requests and lets the gather in
+        # generate_for_node overlap the per-model work (numpy releases the
+        # GIL for the bulk of the fill).
+        embedding = await asyncio.to_thread(
+            deterministic_embedding, content, model["dimension"]
+        )
+        return {
+            "node_id": node["id"],
+            "modality": model["modality"],
+            "model_name": model["model_name"],
+            "source_part": model["source_part"],
+            "embedding": embedding,
+            "content_hash": _hash_content(
+                content, model["model_name"], model["source_part"]
+            ),
+            "dimension": model["dimension"],
+        }
 
     async def store_embedding(
         self,
@@ -146,34 +256,20 @@ class EmbeddingService:
         """Store embedding and ensure HNSW indexes exist."""
 
         dimension = dimension or len(embedding)
-        vector_literal = _vector_literal(embedding)
+        # The pgvector codec (registered in database.init_connection) ships
+        # this as raw binary halfs instead of a formatted text literal.
+        vector = np.asarray(embedding, dtype=np.float32)
 
         try:
             row = await self.db.fetchrow(
-                """
-                INSERT INTO node_embeddings (
-                    node_id, chunk_id, modality, model_name, source_part,
-                    dimension, embedding, content_hash, generation_time_ms, token_count
-                )
-                VALUES ($1::text, $2, $3, $4, $5, $6, $7::vector, $8, $9, $10)
-                ON CONFLICT (node_id, chunk_id, modality, model_name, source_part)
-                DO UPDATE SET
-                    embedding = EXCLUDED.embedding,
-                    content_hash = EXCLUDED.content_hash,
-                    generated_at = NOW(),
-                    last_accessed = NOW(),
-                    dimension = EXCLUDED.dimension,
-                    generation_time_ms = COALESCE(EXCLUDED.generation_time_ms, node_embeddings.generation_time_ms),
-                    token_count = COALESCE(EXCLUDED.token_count, node_embeddings.token_count)
-                RETURNING id, node_id, chunk_id, modality, model_name, source_part, dimension, generated_at
-            """,
+                _SQL_UPSERT_EMBEDDING_RETURNING,
                 node_id,
                 chunk_id,
                 modality,
                 model_name,
                 source_part,
                 dimension,
-                vector_literal,
+                vector,
                 content_hash,
                 generation_time_ms,
                 token_count,
@@ -185,10 +281,48 @@ class EmbeddingService:
 
         return dict(row)
 
-    async def _ensure_hnsw_indexes(self):
-        """Create HNSW indexes if they don't exist yet."""
+    async def store_embeddings_batch(self, items: List[Dict[str, Any]]) -> int:
+        """Upsert many embeddings with one executemany round-trip.
+
+        Each item takes the same keys as ``store_embedding``.
+        """
+
+        rows = [
+            (
+                item["node_id"],
+                item.get("chunk_id"),
+                item["modality"],
+                item["model_name"],
+                item["source_part"],
+                item.get("dimension") or len(item["embedding"]),
+                np.asarray(item["embedding"], dtype=np.float32),
+                item["content_hash"],
+                item.get("generation_time_ms"),
+                item.get("token_count"),
+            )
+            for item in items
+        ]
+
         try:
-            await self.db.execute("SELECT create_hnsw_indexes()")
-        except Exception:
-            # Running without pgvector/hnsw is acceptable in dev/tests
-            pass
+            await self.db.executemany(_SQL_UPSERT_EMBEDDING, rows)
+        except Exception as exc:  # pragma: no cover - defensive fallback
+            raise ValueError("Failed to store embeddings; ensure pgvector is installed") from exc
+
+        await self._ensure_hnsw_indexes()
+
+        return len(rows)
+
+    async def _ensure_hnsw_indexes(self):
+        """Create HNSW indexes if they don't exist yet (once per process)."""
+        if _hnsw_indexes_ready.is_set():
+            return
+        async with _hnsw_indexes_lock:
+            # Re-check after acquiring the lock so concurrent misses dedupe
+            if _hnsw_indexes_ready.is_set():
+                return
+            try:
+                await self.db.execute("SELECT create_hnsw_indexes()")
+                _hnsw_indexes_ready.set()
+            except Exception:
+                # Running without pgvector/hnsw is acceptable in dev/tests
+                pass
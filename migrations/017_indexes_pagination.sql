@@ -0,0 +1,17 @@
+-- ============================================
+-- Keyset Pagination Indexes
+-- ============================================
+
+\c brain_graph
+
+BEGIN;
+
+-- Composite (created_at DESC, id DESC) indexes back the keyset pagination
+-- used by the node/edge list endpoints: WHERE (created_at, id) < ($ts, $id)
+-- ORDER BY created_at DESC, id DESC becomes a plain index range scan
+-- instead of an OFFSET scan-and-discard.
+
+CREATE INDEX IF NOT EXISTS idx_nodes_created_at_id ON nodes (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_edges_created_at_id ON graph_edges (created_at DESC, id DESC);
+
+COMMIT;
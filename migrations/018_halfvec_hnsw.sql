@@ -0,0 +1,245 @@
+-- ============================================
+-- Halfvec Storage + Tuned HNSW Indexes
+-- Requires pgvector >= 0.7
+-- ============================================
+
+\c brain_graph
+
+BEGIN;
+
+-- ============================================
+-- COLUMN MIGRATION: vector -> halfvec
+-- ============================================
+
+-- Half-precision storage halves the bytes scanned per distance computation
+-- (the ANN hot loop is bandwidth-bound); recall loss is negligible for
+-- cosine distance at these dimensions.
+
+ALTER TABLE node_embeddings
+    ALTER COLUMN embedding TYPE halfvec
+    USING embedding::halfvec;
+
+COMMIT;
+
+-- ============================================
+-- HNSW INDEX CREATION FUNCTION (halfvec)
+-- ============================================
+
+-- Drop the old fixed per-model vector indexes; they are rebuilt as
+-- halfvec expression indexes below.
+DROP INDEX IF EXISTS idx_emb_jina_hnsw;
+DROP INDEX IF EXISTS idx_emb_siglip_hnsw;
+DROP INDEX IF EXISTS idx_emb_codebert_hnsw;
+DROP INDEX IF EXISTS idx_emb_whisper_hnsw;
+DROP INDEX IF EXISTS idx_emb_graphsage_hnsw;
+
+CREATE OR REPLACE FUNCTION create_hnsw_indexes()
+RETURNS TEXT AS $$
+DECLARE
+    result TEXT := '';
+    emb_count INTEGER;
+    model RECORD;
+    idx_name TEXT;
+BEGIN
+    SELECT COUNT(*) INTO emb_count FROM node_embeddings;
+
+    IF emb_count = 0 THEN
+        RETURN 'No embeddings yet - HNSW indexes will be created when embeddings are added';
+    END IF;
+
+    -- One partial index per active model. The column is untyped halfvec
+    -- (dimensions differ per model), so each index is built on a
+    -- fixed-dimension cast expression; queries must use the same cast.
+    FOR model IN
+        SELECT model_name, dimension FROM embedding_models WHERE is_active = TRUE
+    LOOP
+        idx_name := 'idx_emb_hnsw_' || translate(model.model_name, '-.', '__');
+        BEGIN
+            EXECUTE format(
+                'CREATE INDEX IF NOT EXISTS %I ON node_embeddings
+                 USING hnsw ((embedding::halfvec(%s)) halfvec_cosine_ops)
+                 WITH (m = 24, ef_construction = 100)
+                 WHERE model_name = %L',
+                idx_name, model.dimension, model.model_name
+            );
+            result := result || '✓ ' || model.model_name || ' HNSW; ';
+        EXCEPTION WHEN OTHERS THEN
+            result := result || '✗ ' || model.model_name || ': ' || SQLERRM || '; ';
+        END;
+    END LOOP;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION create_hnsw_indexes IS 'Create halfvec HNSW vector indexes (run after embeddings exist)';
+
+-- ============================================
+-- HYBRID SEARCH FUNCTIONS (halfvec)
+-- ============================================
+
+-- Parameter type changes from vector to halfvec, so the old signatures
+-- must be dropped first.
+DROP FUNCTION IF EXISTS hybrid_search(TEXT, vector, VARCHAR, FLOAT, INTEGER, node_type[]);
+DROP FUNCTION IF EXISTS hybrid_search_chunks(TEXT, vector, VARCHAR, FLOAT, INTEGER, VARCHAR);
+
+CREATE OR REPLACE FUNCTION hybrid_search(
+    p_query TEXT,
+    p_query_embedding halfvec,
+    p_model_name VARCHAR(100) DEFAULT 'jina-embeddings-v2',
+    p_alpha FLOAT DEFAULT 0.5,
+    p_limit INTEGER DEFAULT 20,
+    p_node_types node_type[] DEFAULT NULL
+)
+RETURNS TABLE (
+    node_id TEXT,
+    node_type node_type,
+    title TEXT,
+    bm25_score FLOAT,
+    vector_score FLOAT,
+    hybrid_score FLOAT
+) AS $$
+DECLARE
+    v_dim INTEGER;
+BEGIN
+    -- The fixed-dimension cast must match the expression the HNSW index
+    -- was built on, otherwise the planner falls back to a seq scan.
+    SELECT dimension INTO v_dim FROM embedding_models WHERE model_name = p_model_name;
+
+    RETURN QUERY EXECUTE format($q$
+    WITH bm25_results AS (
+        -- search_vector is the stored generated column from migration 023;
+        -- matching it runs off the GIN index instead of tokenizing per row
+        SELECT
+            n.id AS nid,
+            ts_rank_cd(n.search_vector, plainto_tsquery('english', $1)) AS bm25_sc
+        FROM nodes n
+        WHERE n.search_vector @@ plainto_tsquery('english', $1)
+        AND ($4 IS NULL OR n.type = ANY($4))
+    ),
+    vector_results AS (
+        SELECT
+            ne.node_id AS nid,
+            1 - ((ne.embedding::halfvec(%1$s)) <=> $2) AS vec_sc
+        FROM node_embeddings ne
+        WHERE ne.model_name = $3
+          AND ne.chunk_id IS NULL  -- Node-level embeddings only
+          AND ne.source_part IN ('full', 'title', 'summary')
+        ORDER BY (ne.embedding::halfvec(%1$s)) <=> $2
+        LIMIT $6 * 3
+    ),
+    combined AS (
+        SELECT
+            COALESCE(b.nid, v.nid) AS nid,
+            COALESCE(b.bm25_sc, 0) AS bm25_sc,
+            COALESCE(v.vec_sc, 0) AS vec_sc,
+            (1 - $5) * COALESCE(b.bm25_sc, 0) + $5 * COALESCE(v.vec_sc, 0) AS hybrid
+        FROM bm25_results b
+        FULL OUTER JOIN vector_results v ON b.nid = v.nid
+    )
+    SELECT
+        c.nid,
+        n.type,
+        n.title,
+        c.bm25_sc,
+        c.vec_sc,
+        c.hybrid
+    FROM combined c
+    JOIN nodes n ON c.nid = n.id
+    WHERE ($4 IS NULL OR n.type = ANY($4))
+    ORDER BY c.hybrid DESC
+    LIMIT $6
+    $q$, v_dim)
+    USING p_query, p_query_embedding, p_model_name, p_node_types, p_alpha, p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION hybrid_search IS 'Hybrid BM25 + halfvec HNSW search over nodes';
+
+CREATE OR REPLACE FUNCTION hybrid_search_chunks(
+    p_query TEXT,
+    p_query_embedding halfvec,
+    p_model_name VARCHAR(100) DEFAULT 'jina-embeddings-v2',
+    p_alpha FLOAT DEFAULT 0.5,          -- 0 = BM25 only, 1 = vector only
+    p_limit INTEGER DEFAULT 20,
+    p_language VARCHAR(10) DEFAULT 'en'
+)
+RETURNS TABLE (
+    chunk_id TEXT,
+    node_id TEXT,
+    node_title TEXT,
+    content TEXT,
+    summary TEXT,
+    bm25_score FLOAT,
+    vector_score FLOAT,
+    hybrid_score FLOAT
+) AS $$
+DECLARE
+    v_dim INTEGER;
+BEGIN
+    SELECT dimension INTO v_dim FROM embedding_models WHERE model_name = p_model_name;
+
+    RETURN QUERY EXECUTE format($q$
+    WITH bm25_results AS (
+        SELECT
+            nc.id AS cid,
+            ts_rank_cd(
+                to_tsvector(CASE WHEN $6 = 'de' THEN 'german' ELSE 'english' END, nc.content),
+                plainto_tsquery(CASE WHEN $6 = 'de' THEN 'german' ELSE 'english' END, $1)
+            ) AS bm25_sc
+        FROM node_chunks nc
+        WHERE to_tsvector(CASE WHEN $6 = 'de' THEN 'german' ELSE 'english' END, nc.content)
+              @@ plainto_tsquery(CASE WHEN $6 = 'de' THEN 'german' ELSE 'english' END, $1)
+    ),
+    vector_results AS (
+        SELECT
+            ne.chunk_id AS cid,
+            1 - ((ne.embedding::halfvec(%1$s)) <=> $2) AS vec_sc
+        FROM node_embeddings ne
+        WHERE ne.chunk_id IS NOT NULL
+          AND ne.model_name = $3
+          AND ne.source_part = 'chunk:content'
+        ORDER BY (ne.embedding::halfvec(%1$s)) <=> $2
+        LIMIT $5 * 3
+    ),
+    combined AS (
+        SELECT
+            COALESCE(b.cid, v.cid) AS cid,
+            COALESCE(b.bm25_sc, 0) AS bm25_sc,
+            COALESCE(v.vec_sc, 0) AS vec_sc,
+            (1 - $4) * COALESCE(b.bm25_sc, 0) + $4 * COALESCE(v.vec_sc, 0) AS hybrid
+        FROM bm25_results b
+        FULL OUTER JOIN vector_results v ON b.cid = v.cid
+    )
+    SELECT
+        c.cid,
+        nc.node_id,
+        n.title,
+        nc.content,
+        nc.summary,
+        c.bm25_sc,
+        c.vec_sc,
+        c.hybrid
+    FROM combined c
+    JOIN node_chunks nc ON c.cid = nc.id
+    JOIN nodes n ON nc.node_id = n.id
+    ORDER BY c.hybrid DESC
+    LIMIT $5
+    $q$, v_dim)
+    USING p_query, p_query_embedding, p_model_name, p_alpha, p_limit, p_language;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION hybrid_search_chunks IS 'Hybrid BM25 + halfvec HNSW search over chunks';
+
+-- ============================================
+-- TRY TO (RE)CREATE INDEXES NOW
+-- ============================================
+
+DO $$
+DECLARE
+    result TEXT;
+BEGIN
+    SELECT create_hnsw_indexes() INTO result;
+    RAISE NOTICE 'HNSW Index Status: %', result;
+END $$;
@@ -0,0 +1,77 @@
+-- ============================================
+-- Single Round-Trip Node Search
+-- ============================================
+
+\c brain_graph
+
+BEGIN;
+
+-- Folds the Python-side "try hybrid, fall back to BM25" branching into one
+-- function so the API issues exactly one query per node search. Pass NULL
+-- for p_query_embedding to get pure BM25.
+
+CREATE OR REPLACE FUNCTION search_nodes_v2(
+    p_query TEXT,
+    p_query_embedding halfvec DEFAULT NULL,
+    p_model_name VARCHAR(100) DEFAULT 'jina-embeddings-v2',
+    p_alpha FLOAT DEFAULT 0.5,
+    p_limit INTEGER DEFAULT 20,
+    p_node_types node_type[] DEFAULT NULL
+)
+RETURNS TABLE (
+    node_id TEXT,
+    node_type node_type,
+    title TEXT,
+    bm25_score FLOAT,
+    vector_score FLOAT,
+    hybrid_score FLOAT
+) AS $$
+BEGIN
+    IF p_query_embedding IS NOT NULL THEN
+        RETURN QUERY
+        SELECT * FROM hybrid_search(
+            p_query, p_query_embedding, p_model_name, p_alpha, p_limit, p_node_types
+        );
+        RETURN;
+    END IF;
+
+    -- BM25 branch: prefer the ParadeDB index, fall back to tsvector
+    BEGIN
+        RETURN QUERY EXECUTE $q$
+            SELECT id,
+                   type,
+                   title,
+                   paradedb.score(id)::FLOAT AS bm25_sc,
+                   NULL::FLOAT,
+                   NULL::FLOAT
+            FROM nodes_search_idx.search($1)
+            WHERE ($2 IS NULL OR type = ANY($2))
+            ORDER BY bm25_sc DESC
+            LIMIT $3
+        $q$ USING p_query, p_node_types, p_limit;
+        RETURN;
+    EXCEPTION WHEN OTHERS THEN
+        -- ParadeDB not installed; use the tsvector ranking below
+        NULL;
+    END;
+
+    -- search_vector is the stored generated column from migration 023;
+    -- matching it runs off the GIN index instead of tokenizing per row
+    RETURN QUERY
+    SELECT n.id,
+           n.type,
+           n.title,
+           ts_rank_cd(n.search_vector, plainto_tsquery('english', p_query))::FLOAT,
+           NULL::FLOAT,
+           NULL::FLOAT
+    FROM nodes n
+    WHERE n.search_vector @@ plainto_tsquery('english', p_query)
+      AND (p_node_types IS NULL OR n.type = ANY(p_node_types))
+    ORDER BY 4 DESC
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION search_nodes_v2 IS 'Node search with server-side BM25/hybrid dispatch (one round-trip)';
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- ============================================
+-- Edge-by-Node Listing Indexes
+-- ============================================
+
+\c brain_graph
+
+BEGIN;
+
+-- The "edges touching node X" query is served as a UNION ALL of a
+-- source_id branch and a target_id branch, each of which should be an
+-- index range scan already ordered by recency. These composite indexes
+-- supersede the single-column idx_edges_source/idx_edges_target for the
+-- list endpoint while still covering plain equality lookups.
+
+CREATE INDEX IF NOT EXISTS idx_edges_source_created_at
+    ON graph_edges (source_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_edges_target_created_at
+    ON graph_edges (target_id, created_at DESC);
+
+COMMIT;
@@ -0,0 +1,32 @@
+-- ============================================
+-- Taxonomy Keywords as JSONB
+-- ============================================
+
+\c brain_graph
+
+BEGIN;
+
+-- text[] keywords travel over the wire in array-literal form and need a
+-- separate decode path client-side; as jsonb they ride the orjson codec
+-- registered on every pool connection, matching related_categories. The
+-- GIN index is recreated with jsonb_path_ops for containment queries.
+
+DROP INDEX IF EXISTS idx_taxonomy_keywords;
+
+ALTER TABLE taxonomy
+    ALTER COLUMN keywords TYPE jsonb USING to_jsonb(keywords),
+    ALTER COLUMN keywords SET DEFAULT '[]'::jsonb;
+
+UPDATE taxonomy SET keywords = '[]'::jsonb WHERE keywords IS NULL;
+
+-- taxonomy_history was created LIKE taxonomy (006) and receives OLD rows
+-- from the versioning trigger (011); its keywords column must change in
+-- lockstep or the first taxonomy UPDATE/DELETE fails on jsonb -> text[].
+ALTER TABLE taxonomy_history
+    ALTER COLUMN keywords TYPE jsonb USING to_jsonb(keywords),
+    ALTER COLUMN keywords SET DEFAULT '[]'::jsonb;
+
+CREATE INDEX IF NOT EXISTS idx_taxonomy_keywords
+    ON taxonomy USING GIN (keywords jsonb_path_ops);
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- ============================================
+-- Database-Level Search Path
+-- ============================================
+
+\c brain_graph
+
+BEGIN;
+
+-- AGE is preloaded via shared_preload_libraries in postgresql.conf, so the
+-- only per-connection setup left was SET search_path. Persisting it on the
+-- database removes that statement from pool warmup entirely: every new
+-- session starts with ag_catalog resolved.
+
+ALTER DATABASE brain_graph SET search_path = ag_catalog, "$user", public;
+
+COMMIT;
@@ -0,0 +1,24 @@
+-- ============================================
+-- Stored tsvector Column for BM25 Fallback
+-- ============================================
+
+\c brain_graph
+
+BEGIN;
+
+-- The tsvector fallback search recomputed
+-- to_tsvector(title || ' ' || text_content) twice per row on every query
+-- (once in WHERE, once in ts_rank_cd) with no index support. A stored
+-- generated column tokenizes once per write instead, and the GIN index
+-- turns the fallback into an index scan.
+
+ALTER TABLE nodes
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('english', COALESCE(title, '') || ' ' || COALESCE(text_content, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_nodes_search_vector
+    ON nodes USING GIN (search_vector);
+
+COMMIT;
@@ -1,7 +1,8 @@
-import pytest
+import asyncio
+
+import orjson
 
 
-@pytest.mark.asyncio
 async def test_health_endpoint(client):
     """Test health check endpoint"""
     response = await client.get("/health")
@@ -9,7 +10,6 @@ async def test_health_endpoint(client):
     assert response.json()["status"] == "healthy"
 
 
-@pytest.mark.asyncio
 async def test_create_node_api(client, sample_node_data):
     """Test node creation via API"""
     response = await client.post("/api/nodes/", json=sample_node_data)
@@ -24,7 +24,6 @@ async def test_create_node_api(client, sample_node_data):
     assert data["title"] == sample_node_data["title"]
 
 
-@pytest.mark.asyncio
 async def test_get_node_api(client, sample_node_data):
     """Test getting node via API"""
     # Create node first
@@ -40,14 +39,16 @@ async def test_get_node_api(client, sample_node_data):
     assert data["title"] == sample_node_data["title"]
 
 
-@pytest.mark.asyncio
 async def test_list_nodes_api(client, sample_node_data):
     """Test listing nodes via API"""
-    # Create a few nodes
-    for i in range(3):
-        node_data = sample_node_data.copy()
-        node_data["title"] = f"Test Node {i}"
-        await client.post("/api/nodes/", json=node_data)
+    # Create a few nodes; the POSTs are independent, so fan them out
+    payloads = [
+        {**sample_node_data, "title": f"Test Node {i}"} for i in range(3)
+    ]
+    responses = await asyncio.gather(
+        *(client.post("/api/nodes/", json=p) for p in payloads)
+    )
+    assert all(r.status_code == 200 for r in responses)
 
     # List nodes
     response = await client.get("/api/nodes/")
@@ -57,7 +58,6 @@ async def test_list_nodes_api(client, sample_node_data):
     assert len(data) >= 3
 
 
-@pytest.mark.asyncio
 async def test_delete_node_api(client, sample_node_data):
     """Test deleting node via API"""
     # Create node
@@ -75,15 +75,9 @@ async def test_delete_node_api(client, sample_node_data):
     assert get_response.status_code == 404
 
 
-@pytest.mark.asyncio
-async def test_search_api(client, sample_node_data):
+async def test_search_api(client, seeded_nodes):
     """Test search endpoint"""
-    # Create test nodes
-    for i in range(5):
-        node_data = sample_node_data.copy()
-        node_data["title"] = f"Search Test {i}"
-        node_data["text_content"] = f"Content about artificial intelligence {i}"
-        await client.post("/api/nodes/", json=node_data)
+    # The session corpus already contains "artificial intelligence" nodes
 
     # Search
     response = await client.post(
@@ -91,7 +85,7 @@ async def test_search_api(client, sample_node_data):
     )
 
     assert response.status_code == 200
-    results = response.json()
+    results = orjson.loads(response.content)
     assert len(results) > 0
     assert "node_id" in results[0]
     assert "similarity" in results[0] or "bm25_score" in results[0]
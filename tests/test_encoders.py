@@ -1,56 +1,35 @@
-import httpx
+import orjson
 import pytest
 
-ENCODER_URLS = {
-    "jina": "http://localhost:8001",
-    "siglip": "http://localhost:8002",
-    "codebert": "http://localhost:8003",
-    "whisper": "http://localhost:8005",
-}
+from conftest import ENCODER_URLS
 
 
-@pytest.mark.asyncio
-async def test_jina_health():
-    """Test Jina encoder health"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{ENCODER_URLS['jina']}/health", timeout=10.0)
-            assert response.status_code == 200
-            assert response.json()["status"] == "healthy"
-        except httpx.ConnectError:
-            pytest.skip("Jina encoder not running")
+@pytest.mark.parametrize("name", list(ENCODER_URLS))
+async def test_encoder_health(name, encoder_health):
+    """Test encoder health (one case per encoder service)"""
+    response = encoder_health[name]
+    if response is None:
+        pytest.skip(f"{name} encoder not running")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
 
 
-@pytest.mark.asyncio
-async def test_jina_embedding():
+async def test_jina_embedding(http, encoder_health):
     """Test Jina text embedding"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{ENCODER_URLS['jina']}/embed",
-                json={"texts": ["Hello world", "Test text"]},
-                timeout=30.0,
-            )
-            assert response.status_code == 200
-            data = response.json()
-
-            assert "embeddings" in data
-            assert len(data["embeddings"]) == 2
-            assert data["dimension"] == 768
-            assert len(data["embeddings"][0]) == 768
-        except httpx.ConnectError:
-            pytest.skip("Jina encoder not running")
-
-
-@pytest.mark.asyncio
-async def test_siglip_health():
-    """Test SigLIP encoder health"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{ENCODER_URLS['siglip']}/health", timeout=10.0
-            )
-            assert response.status_code == 200
-            assert response.json()["status"] == "healthy"
-        except httpx.ConnectError:
-            pytest.skip("SigLIP encoder not running")
+    if encoder_health["jina"] is None:
+        pytest.skip("Jina encoder not running")
+
+    response = await http.post(
+        f"{ENCODER_URLS['jina']}/embed",
+        json={"texts": ["Hello world", "Test text"]},
+        timeout=30.0,
+    )
+    assert response.status_code == 200
+    # orjson decodes the 768-dim float arrays far faster than response.json()
+    data = orjson.loads(response.content)
+
+    assert "embeddings" in data
+    assert len(data["embeddings"]) == 2
+    assert data["dimension"] == 768
+    assert len(data["embeddings"][0]) == 768
+
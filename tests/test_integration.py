@@ -1,7 +1,8 @@
+import asyncio
+
 import pytest
 
 
-@pytest.mark.asyncio
 @pytest.mark.integration
 async def test_full_workflow(client, db, sample_node_data):
     """Test complete workflow: create, embed, search, retrieve"""
@@ -29,9 +30,14 @@ async def test_full_workflow(client, db, sample_node_data):
     except Exception:
         pytest.skip("Encoder not available")
 
-    # 3. Search for node
-    search_response = await client.post(
-        "/api/search/", json={"query": sample_node_data["text_content"], "limit": 5}
+    # 3+4. Search for the node and retrieve it; the two requests are
+    # independent, so they run concurrently
+    search_response, get_response = await asyncio.gather(
+        client.post(
+            "/api/search/",
+            json={"query": sample_node_data["text_content"], "limit": 5},
+        ),
+        client.get(f"/api/nodes/{node_id}"),
     )
     assert search_response.status_code == 200
     results = search_response.json()
@@ -40,20 +46,24 @@ async def test_full_workflow(client, db, sample_node_data):
     found_ids = [r["node_id"] for r in results]
     assert node_id in found_ids
 
-    # 4. Retrieve node
-    get_response = await client.get(f"/api/nodes/{node_id}")
     assert get_response.status_code == 200
 
-    # 5. Check access was tracked
-    access_count = await db.fetchval(
-        """
-        SELECT (decay_metadata->'usage_stats'->>'access_count')::int
-        FROM nodes WHERE id = $1
-    """,
-        node_id,
-    )
-    assert access_count >= 1
-
-    # 6. Compute decay score
-    decay_score = await db.fetchval("SELECT compute_decay_score($1)", node_id)
-    assert 0 <= decay_score <= 1
+    # 5+6. Check access was tracked and compute the decay score in one
+    # round-trip (both read the same row). Tracking runs in a background
+    # task that commits after the response is sent, so poll briefly
+    # instead of asserting on the first read.
+    row = None
+    for _ in range(20):
+        row = await db.fetchrow(
+            """
+            SELECT (decay_metadata->'usage_stats'->>'access_count')::int AS access_count,
+                   compute_decay_score(id) AS decay_score
+            FROM nodes WHERE id = $1
+        """,
+            node_id,
+        )
+        if row["access_count"]:
+            break
+        await asyncio.sleep(0.1)
+    assert row["access_count"] >= 1
+    assert 0 <= row["decay_score"] <= 1